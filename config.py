@@ -5,5 +5,8 @@ DATASET_SPLIT = "train[:5001]" # Ensure you split is correct else it runs all
 TEMPLATE_PATH = "template.json"
 RESULTS_DIR = "results"
 MAX_NEW_TOKENS = 512
+STOP_SEQUENCES = ["}\n```"] # Closing fence of the JSON block the prompt asks for; generation halts there instead of running to MAX_NEW_TOKENS
 TEMPERATURE = 0.2
 MAX_NUM_SEQS = 128
+TENSOR_PARALLEL_SIZE = None # Number of GPUs to shard the model across; None uses the most visible GPUs that evenly split the attention heads
+SPECULATIVE_CONFIG = {"method": "ngram", "num_speculative_tokens": 5, "prompt_lookup_max": 4} # Outputs repeat the template keys from the prompt; set to None to disable
@@ -1,12 +1,17 @@
 import os
+import re
 import json
-from rdflib import Graph, Literal, RDF, URIRef, Namespace
+import sys
+import mmap
+import orjson
+import multiprocessing
+from rdflib import Graph, RDF, Namespace
 from rdflib.namespace import XSD
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
 from typing import Dict, Any, Set, Tuple, List, Optional
 from config import RESULTS_DIR
-from utils import assert_file_exists
+from utils import invalidate_processed_manifest
 
 EX = Namespace("http://example.org/vocab#")
 BASE = "http://example.org/persona/"
@@ -14,12 +19,14 @@ BASE = "http://example.org/persona/"
 INPUT_DIR = RESULTS_DIR
 OUTPUT_DIR = f"{RESULTS_DIR}/rdf_processed"
 
-MAIN_RDF_FILE = os.path.join(OUTPUT_DIR, "personas-db.ttl")
+MAIN_RDF_FILE = os.path.join(OUTPUT_DIR, "personas-db.nt")
+TURTLE_RDF_FILE = os.path.join(OUTPUT_DIR, "personas-db.ttl")
 UNPROCESSED_JSON_FILE = os.path.join(OUTPUT_DIR, "unprocessed_personas-db.json")
 
 VERBOSE = False
 PROCESS_ALL_PERSONAS = True
 DELETE_UNPROCESSED_JSONS = True
+EXPORT_TURTLE = False
 
 FIELD_DEFINITIONS = {
     "ability to speak english": ("string", "abilityToSpeakEnglish"),
@@ -58,15 +65,46 @@ FIELD_DEFINITIONS = {
     "description": ("string", "description"),
 }
 
+FIELD_KEYS = set(FIELD_DEFINITIONS)
+FIELD_KEYS_LOWER = {key.lower(): key for key in FIELD_DEFINITIONS}
+
+# N-Triples building blocks, encoded once so per-persona conversion is plain bytes formatting.
+FIELD_PREDICATES = {
+    key: (f"<{EX[name]}>".encode('utf-8'), intended_type, name)
+    for key, (intended_type, name) in FIELD_DEFINITIONS.items()
+}
+BIG_FIVE_PREDICATES = {
+    trait: f"<{EX[trait]}>".encode('utf-8')
+    for trait in ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+}
+RDF_TYPE = f"<{RDF.type}>".encode('utf-8')
+EX_PERSONA = f"<{EX.Persona}>".encode('utf-8')
+EX_SOURCE = f"<{EX.source}>".encode('utf-8')
+XSD_STRING = f"<{XSD.string}>".encode('utf-8')
+XSD_INTEGER = f"<{XSD.integer}>".encode('utf-8')
+XSD_FLOAT = f"<{XSD.float}>".encode('utf-8')
+
+PERSONA_SUBJECT_PATTERN = re.compile(
+    rb"^<" + re.escape(BASE.encode('utf-8')) + rb"(\d+)> " + re.escape(RDF_TYPE) + rb" " + re.escape(EX_PERSONA) + rb" \.\r?$",
+    re.MULTILINE,
+)
+
+_LITERAL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
 def load_json_file(filepath: str) -> Optional[Dict[str, Any]]:
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if not isinstance(data, dict):
-                if VERBOSE:
-                    print(f"ERROR: JSON file '{filepath}' did not contain a dictionary at its root. Found: {type(data)}")
-                return None
-            return data
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        try:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Files written with json.dump may contain NaN/Infinity, which only the stdlib parser accepts.
+            data = json.loads(raw)
+        if not isinstance(data, dict):
+            if VERBOSE:
+                print(f"ERROR: JSON file '{filepath}' did not contain a dictionary at its root. Found: {type(data)}")
+            return None
+        return data
     except FileNotFoundError:
         if VERBOSE:
             print(f"ERROR: File not found at '{filepath}'.")
@@ -80,67 +118,82 @@ def load_json_file(filepath: str) -> Optional[Dict[str, Any]]:
             print(f"ERROR: An unexpected error occurred while loading '{filepath}': {e}")
         return None
 
-def save_json_file(filepath: str, data: Dict[str, Any]):
+def save_json_file(filepath: str, data: Dict[str, Any], pretty: bool = False):
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
     except Exception as e:
         print(f"CRITICAL ERROR: Could not save JSON to '{filepath}': {e}")
 
-def process_single_field_to_rdf(g: Graph, person_uri: URIRef, value: Any, intended_type: str, rdf_predicate_name: str, persona_id: int) -> bool:
+def escape_literal(value: str) -> str:
+    return value.translate(_LITERAL_ESCAPES)
+
+def _typed_literal_triple(subject: bytes, predicate: bytes, lexical: str, datatype: bytes) -> bytes:
+    return b'%s %s "%s"^^%s .\n' % (subject, predicate, escape_literal(lexical).encode('utf-8'), datatype)
+
+def _string_literals(value: Any) -> List[Tuple[str, bytes]]:
+    return [(str(value), XSD_STRING)]
+
+def _integer_literals(value: Any) -> List[Tuple[str, bytes]]:
+    return [(str(int(value)), XSD_INTEGER)]
+
+def _float_literals(value: Any) -> List[Tuple[str, bytes]]:
+    return [(str(float(value)), XSD_FLOAT)]
+
+def _string_or_list_literals(value: Any) -> List[Tuple[str, bytes]]:
+    if isinstance(value, list):
+        return [(str(item), XSD_STRING) for item in value]
+    return [(str(value), XSD_STRING)]
+
+LITERAL_ENCODERS = {
+    "string": _string_literals,
+    "integer": _integer_literals,
+    "float": _float_literals,
+    "string_or_list": _string_or_list_literals,
+}
+
+def process_single_field_to_ntriples(lines: List[bytes], person_uri: bytes, predicate: bytes, value: Any, intended_type: str, rdf_predicate_name: str, persona_id: int) -> bool:
     conversion_successful = True
     if value is None:
         return conversion_successful
 
-    predicate = EX[rdf_predicate_name]
+    encoder = LITERAL_ENCODERS.get(intended_type)
+    if encoder is None:
+        return conversion_successful
 
-    if intended_type == "string":
-        g.add((person_uri, predicate, Literal(str(value), datatype=XSD.string)))
-    elif intended_type == "integer":
-        try:
-            g.add((person_uri, predicate, Literal(int(value), datatype=XSD.integer)))
-        except (ValueError, TypeError):
-            if VERBOSE:
-                print(f"WARNING (Persona {persona_id}): Type conversion failed for predicate '{rdf_predicate_name}' with value '{value}' (expected integer). This persona will NOT be added to the main RDF graph.")
-            g.add((person_uri, predicate, Literal(str(value), datatype=XSD.string)))
-            conversion_successful = False
-    elif intended_type == "float":
-        try:
-            g.add((person_uri, predicate, Literal(float(value), datatype=XSD.float)))
-        except (ValueError, TypeError):
-            if VERBOSE:
-                print(f"WARNING (Persona {persona_id}): Type conversion failed for predicate '{rdf_predicate_name}' with value '{value}' (expected float). This persona will NOT be added to the main RDF graph.")
-            g.add((person_uri, predicate, Literal(str(value), datatype=XSD.string)))
-            conversion_successful = False
-    elif intended_type == "string_or_list":
-        if isinstance(value, list):
-            for item in value:
-                g.add((person_uri, predicate, Literal(str(item), datatype=XSD.string)))
-        else:
-            g.add((person_uri, predicate, Literal(str(value), datatype=XSD.string)))
+    try:
+        literals = encoder(value)
+    except (ValueError, TypeError):
+        if VERBOSE:
+            print(f"WARNING (Persona {persona_id}): Type conversion failed for predicate '{rdf_predicate_name}' with value '{value}' (expected {intended_type}). This persona will NOT be added to the main RDF graph.")
+        literals = _string_literals(value)
+        conversion_successful = False
+
+    for lexical, datatype in literals:
+        lines.append(_typed_literal_triple(person_uri, predicate, lexical, datatype))
 
     return conversion_successful
 
 def warn_on_unrecognized_keys(person_id: int, data: Dict[str, Any]):
-    unrecognized_keys = []
-    for key in data.keys():
-        if key not in FIELD_DEFINITIONS:
-            unrecognized_keys.append(key)
+    unrecognized_keys = data.keys() - FIELD_KEYS
 
     if unrecognized_keys:
         if VERBOSE:
             print(f"\nWARNING (ID {person_id}): Persona data contains unrecognized keys that will be skipped:")
-            print(f"  Unrecognized: {unrecognized_keys}")
+            print(f"  Unrecognized: {sorted(unrecognized_keys)}")
             print(f"  Keys in JSON: {sorted(list(data.keys()))}")
             print(f"  Expected (from FIELD_DEFINITIONS): {sorted(list(FIELD_DEFINITIONS.keys()))}\n")
 
-            for uk in unrecognized_keys:
+            for uk in sorted(unrecognized_keys):
                 if uk.strip() != uk:
                     print(f"  HINT: Unrecognized key '{uk}' has leading/trailing whitespace. Consider stripping it.")
-                elif uk.lower() in [k.lower() for k in FIELD_DEFINITIONS.keys()] and uk not in FIELD_DEFINITIONS:
-                     print(f"  HINT: Key '{uk}' might have incorrect casing compared to FIELD_DEFINITIONS.")
+                elif uk.lower() in FIELD_KEYS_LOWER:
+                     print(f"  HINT: Key '{uk}' might have incorrect casing compared to FIELD_DEFINITIONS. Did you mean '{FIELD_KEYS_LOWER[uk.lower()]}'?")
 
-def convert_persona_json_to_rdf_graph(person_id: int, data: Dict[str, Any]) -> Tuple[Optional[Graph], bool]:
+def convert_persona_json_to_ntriples(person_id: int, data: Dict[str, Any]) -> Tuple[Optional[List[bytes]], bool]:
     if not isinstance(data, dict) or not data:
         if VERBOSE:
             print(f"ERROR (ID {person_id}): Persona data is empty or not a dictionary. Cannot process.")
@@ -148,14 +201,10 @@ def convert_persona_json_to_rdf_graph(person_id: int, data: Dict[str, Any]) -> T
 
     warn_on_unrecognized_keys(person_id, data)
 
-    person_uri = URIRef(f"{BASE}{person_id}")
-    source_uri = URIRef(f"https://huggingface.co/datasets/proj-persona/PersonaHub/viewer/persona/train?row={person_id}")
+    person_uri = f"<{BASE}{person_id}>".encode('utf-8')
+    source_uri = f"<https://huggingface.co/datasets/proj-persona/PersonaHub/viewer/persona/train?row={person_id}>".encode('utf-8')
 
-    g = Graph()
-    g.bind("ex", EX)
-    g.bind("xsd", XSD)
-    g.add((person_uri, RDF.type, EX.Persona))
-    g.add((person_uri, EX.source, source_uri))
+    lines = [b"%s %s %s .\n" % (person_uri, EX_SOURCE, source_uri)]
 
     conversion_warnings_occurred = False
 
@@ -165,76 +214,67 @@ def convert_persona_json_to_rdf_graph(person_id: int, data: Dict[str, Any]) -> T
                 bfs_data = value if isinstance(value, dict) else {}
                 for trait, score in bfs_data.items():
                     if score is not None:
-                        cleaned_trait = trait.replace(" ", "")
-                        trait_predicate_name = cleaned_trait[0].lower() + cleaned_trait[1:] if cleaned_trait else ""
-                        trait_uri = EX[trait_predicate_name]
-                        g.add((person_uri, trait_uri, Literal(str(score), datatype=XSD.string)))
-            elif key in FIELD_DEFINITIONS:
-                definition = FIELD_DEFINITIONS.get(key)
-                if definition and definition[0] != "special_nested":
-                    intended_type, rdf_predicate_name = definition
-                    field_successful = process_single_field_to_rdf(g, person_uri, value, intended_type, rdf_predicate_name, person_id)
+                        trait_uri = BIG_FIVE_PREDICATES.get(trait.lower().replace(" ", ""))
+                        if trait_uri is None:
+                            cleaned_trait = trait.replace(" ", "")
+                            trait_predicate_name = cleaned_trait[0].lower() + cleaned_trait[1:] if cleaned_trait else ""
+                            trait_uri = f"<{EX[trait_predicate_name]}>".encode('utf-8')
+                        lines.append(_typed_literal_triple(person_uri, trait_uri, str(score), XSD_STRING))
+            elif key in FIELD_PREDICATES:
+                predicate, intended_type, rdf_predicate_name = FIELD_PREDICATES[key]
+                if intended_type != "special_nested":
+                    field_successful = process_single_field_to_ntriples(lines, person_uri, predicate, value, intended_type, rdf_predicate_name, person_id)
                     if not field_successful:
                         conversion_warnings_occurred = True
 
         if conversion_warnings_occurred:
             return None, True
 
-        return g, False
+        # The type triple goes last: a persona only counts as processed once its whole block is on disk.
+        lines.append(b"%s %s %s .\n" % (person_uri, RDF_TYPE, EX_PERSONA))
+        return lines, False
 
     except Exception as e:
         if VERBOSE:
             print(f"ERROR (Persona {person_id}): RDF conversion failed. Details: {e}")
         return None, False
 
-def convert_and_get_result_wrapper(person_id: int, filepath: str) -> Tuple[int, Optional[Graph], str]:
-    assert_file_exists(filepath)
-    
-    data = load_json_file(filepath)
-    if data is None:
-        return person_id, None, "load_error"
-
+def convert_and_get_result_wrapper(person_id: int, filepath: str) -> Tuple[int, Optional[bytes], str, Optional[Dict[str, Any]]]:
+    # executor.map cannot isolate a single failing task, so nothing may escape this function.
+    # On failure the parsed JSON is handed back so the main process does not have to load it again.
+    data = None
     try:
-        graph, conversion_warnings_occurred = convert_persona_json_to_rdf_graph(person_id, data)
+        data = load_json_file(filepath)
+        if data is None:
+            return person_id, None, "load_error", None
 
-        if graph is not None:
-            return person_id, graph, "success"
+        ntriples, conversion_warnings_occurred = convert_persona_json_to_ntriples(person_id, data)
+
+        if ntriples is not None:
+            # A single bytes blob pickles as one contiguous buffer on the way back to the main process.
+            return person_id, b"".join(ntriples), "success", None
         elif conversion_warnings_occurred:
-            return person_id, None, "conversion_warning"
+            return person_id, None, "conversion_warning", data
         else:
-            return person_id, None, "conversion_error_or_empty_data" 
+            return person_id, None, "conversion_error_or_empty_data", data
     except Exception as e:
         if VERBOSE:
             print(f"CRITICAL ERROR: Uncaught exception during parallel processing of persona {person_id} from {filepath}: {e}")
-        return person_id, None, "unhandled_exception"
+        return person_id, None, "unhandled_exception", data
 
 def load_processed_persona_ids_from_rdf(filepath: str) -> Set[int]:
     processed_ids = set()
     if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
         return processed_ids
 
-    g_temp = Graph()
+    # The main file is N-Triples written by this script, so a byte-level scan replaces a full RDF parse.
     try:
-        g_temp.parse(filepath, format='turtle')
-    except Exception as e:
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in PERSONA_SUBJECT_PATTERN.finditer(mm):
+                processed_ids.add(int(match.group(1)))
+    except (OSError, ValueError) as e:
         if VERBOSE:
-            print(f"WARNING: Could not parse existing main RDF file '{filepath}'. It might be corrupted or malformed. Error: {e}")
-        return processed_ids
-
-    for s, _, _ in g_temp.triples((None, RDF.type, EX.Persona)):
-        try:
-            person_id_str = str(s).split('/')[-1]
-            if person_id_str.isdigit():
-                processed_ids.add(int(person_id_str))
-            else:
-                if VERBOSE:
-                    print(f"WARNING (File: {filepath}): Malformed Persona URI segment encountered: '{person_id_str}' from URI '{s}'. Skipping.")
-        except ValueError:
-            if VERBOSE:
-                print(f"WARNING (File: {filepath}): Malformed Persona URI encountered: {s}. Skipping.")
-        except Exception as e:
-            if VERBOSE:
-                print(f"WARNING (File: {filepath}): Unexpected error processing URI '{s}': {e}. Skipping.")
+            print(f"WARNING: Could not scan existing main RDF file '{filepath}'. Error: {e}")
     return processed_ids
 
 def load_unprocessed_personas_data(filepath: str) -> Dict[str, Dict[str, Any]]:
@@ -245,21 +285,52 @@ def load_unprocessed_personas_data(filepath: str) -> Dict[str, Dict[str, Any]]:
 def save_unprocessed_personas_data(filepath: str, data: Dict[str, Any]):
     save_json_file(filepath, data)
 
-def append_graphs_to_main_rdf(main_graph: Graph, new_graphs: List[Graph], main_rdf_filepath: str):
-    if not new_graphs:
+def repair_main_rdf_tail(main_rdf_filepath: str):
+    if not os.path.exists(main_rdf_filepath) or os.path.getsize(main_rdf_filepath) == 0:
+        return
+
+    # An interrupted append can leave a partial last line; cut it off so the next append starts on a fresh line.
+    # Any persona in that block loses its type triple with it, so it is picked up again on the next run.
+    with open(main_rdf_filepath, 'rb+') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[-1:] == b"\n":
+                return
+            keep_size = mm.rfind(b"\n") + 1
+        f.truncate(keep_size)
+    print(f"WARNING: Removed a partially written last line from '{main_rdf_filepath}' ({keep_size} bytes kept).")
+
+def append_graphs_to_main_rdf(new_ntriples: List[bytes], main_rdf_filepath: str):
+    if not new_ntriples:
         print("INFO: No new graphs to append to the main RDF file.")
         return
 
-    for g_new in new_graphs:
-        main_graph += g_new
+    # The main file is append-only N-Triples, so a run only writes its own new triples.
+    try:
+        with open(main_rdf_filepath, 'ab') as f:
+            f.write(b"".join(new_ntriples))
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"INFO: Successfully appended {len(new_ntriples)} personas to main RDF file '{main_rdf_filepath}'.")
+    except Exception as e:
+        print(f"CRITICAL ERROR: Failed to append to main RDF file '{main_rdf_filepath}'. Data might be incomplete. Error: {e}")
 
-    temp_path = main_rdf_filepath + ".tmp"
+def export_main_rdf_as_turtle(main_rdf_filepath: str, turtle_filepath: str):
+    if not os.path.exists(main_rdf_filepath) or os.path.getsize(main_rdf_filepath) == 0:
+        print(f"INFO: '{main_rdf_filepath}' not found or is empty. Nothing to export.")
+        return
+
+    graph = Graph()
+    graph.bind("ex", EX)
+    graph.bind("xsd", XSD)
+
+    temp_path = turtle_filepath + ".tmp"
     try:
-        main_graph.serialize(destination=temp_path, format='turtle')
-        os.replace(temp_path, main_rdf_filepath)
-        print(f"INFO: Successfully saved updated main RDF graph to '{main_rdf_filepath}'.")
+        graph.parse(main_rdf_filepath, format='nt')
+        graph.serialize(destination=temp_path, format='turtle')
+        os.replace(temp_path, turtle_filepath)
+        print(f"INFO: Exported {len(graph)} triples from '{main_rdf_filepath}' to '{turtle_filepath}'.")
     except Exception as e:
-        print(f"CRITICAL ERROR: Failed to save or replace main RDF file '{main_rdf_filepath}'. Data might be incomplete. Error: {e}")
+        print(f"CRITICAL ERROR: Failed to export '{main_rdf_filepath}' as Turtle. Error: {e}")
         if os.path.exists(temp_path):
             os.remove(temp_path)
 
@@ -267,49 +338,44 @@ def process_all_personas():
     print(f"\n--- Starting Persona Processing ---")
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    main_rdf_graph = Graph()
-    try:
-        if os.path.exists(MAIN_RDF_FILE) and os.path.getsize(MAIN_RDF_FILE) > 0:
-            main_rdf_graph.parse(MAIN_RDF_FILE, format='turtle')
-            print(f"INFO: Loaded existing main RDF graph from '{MAIN_RDF_FILE}'. Contains {len(main_rdf_graph)} triples.")
-        else:
-            print(f"INFO: '{MAIN_RDF_FILE}' not found or is empty. Starting with an empty main RDF graph.")
-    except Exception as e:
-        if VERBOSE:
-            print(f"WARNING: Could not parse existing '{MAIN_RDF_FILE}'. Starting with an empty graph. Error: {e}")
-    main_rdf_graph.bind("ex", EX)
-    main_rdf_graph.bind("xsd", XSD)
-    
+    if os.path.exists(MAIN_RDF_FILE) and os.path.getsize(MAIN_RDF_FILE) > 0:
+        print(f"INFO: New personas will be appended to existing main RDF file '{MAIN_RDF_FILE}'.")
+    else:
+        print(f"INFO: '{MAIN_RDF_FILE}' not found or is empty. Starting a new main RDF file.")
+
+    # Repair before scanning, so a type triple that lost only its newline is not counted as processed.
+    repair_main_rdf_tail(MAIN_RDF_FILE)
     processed_ids_in_main_rdf = load_processed_persona_ids_from_rdf(MAIN_RDF_FILE)
     unprocessed_personas_data = load_unprocessed_personas_data(UNPROCESSED_JSON_FILE)
 
-    all_json_files_in_input_dir = [
-        os.path.join(INPUT_DIR, f)
-        for f in os.listdir(INPUT_DIR)
-        if f.startswith("persona_") and f.endswith(".json")
-    ]
-    if not all_json_files_in_input_dir:
-        print(f"ERROR: No 'persona_*.json' files found in '{INPUT_DIR}'. Please check the INPUT_DIR path.")
-        return
+    total_json_files_in_input_dir = 0
+    candidate_files_for_processing = {}
 
-    candidate_files_for_processing = []
+    with os.scandir(INPUT_DIR) as entries:
+        for entry in entries:
+            filename = entry.name
+            if not (filename.startswith("persona_") and filename.endswith(".json")):
+                continue
+            total_json_files_in_input_dir += 1
 
-    for filepath in all_json_files_in_input_dir:
-        filename = os.path.basename(filepath)
-        try:
-            person_id_str = filename.split("_")[1].split(".")[0]
+            person_id_str = filename[len("persona_"):-len(".json")]
+            if not person_id_str.isdecimal():
+                if VERBOSE:
+                    print(f"WARNING: Skipping malformed filename: '{filename}'. Cannot extract persona ID. Please ensure filenames are in 'persona_ID.json' format (e.g., 'persona_123.json').")
+                continue
             person_id = int(person_id_str)
 
             if person_id not in processed_ids_in_main_rdf:
-                candidate_files_for_processing.append((person_id, filepath))
-        except (ValueError, IndexError):
-            if VERBOSE:
-                print(f"WARNING: Skipping malformed filename: '{filename}'. Cannot extract persona ID. Please ensure filenames are in 'persona_ID.json' format (e.g., 'persona_123.json').")
+                candidate_files_for_processing[person_id] = entry.path
+
+    if not total_json_files_in_input_dir:
+        print(f"ERROR: No 'persona_*.json' files found in '{INPUT_DIR}'. Please check the INPUT_DIR path.")
+        return
 
-    files_to_process_now = sorted(list(set(candidate_files_for_processing)), key=lambda x: x[0])
+    files_to_process_now = sorted(candidate_files_for_processing.items())
 
     print(f"\n--- Processing Run Summary ---")
-    print(f"Total JSON files found in '{INPUT_DIR}': {len(all_json_files_in_input_dir)}")
+    print(f"Total JSON files found in '{INPUT_DIR}': {total_json_files_in_input_dir}")
     print(f"Personas already successfully in '{MAIN_RDF_FILE}': {len(processed_ids_in_main_rdf)}")
     print(f"Personas listed as unprocessed in '{UNPROCESSED_JSON_FILE}' at start: {len(unprocessed_personas_data)}")
     print(f"Will attempt to process {len(files_to_process_now)} unique personas (new or previously unprocessed).")
@@ -319,51 +385,59 @@ def process_all_personas():
         print("\n--- Processing Run Complete ---")
         return
 
-    newly_successful_graphs = []
+    newly_successful_ntriples = []
 
     num_workers = os.cpu_count() or 4
-    print(f"INFO: Using {num_workers} parallel processes for persona conversion.")
+    chunksize = max(1, len(files_to_process_now) // (num_workers * 4))
+    print(f"INFO: Using {num_workers} parallel processes for persona conversion (chunksize {chunksize}).")
 
-    with ProcessPoolExecutor(max_workers=num_workers) as executor:
-        futures = {executor.submit(convert_and_get_result_wrapper, pid, fp): (pid, fp)
-                   for pid, fp in files_to_process_now}
+    # forkserver workers import this module once each instead of inheriting or re-pickling its state per task.
+    mp_context = multiprocessing.get_context("forkserver") if sys.platform.startswith("linux") else None
+    person_ids = [pid for pid, _ in files_to_process_now]
+    filepaths = [fp for _, fp in files_to_process_now]
 
-        for future in tqdm(futures, total=len(files_to_process_now), desc="Converting Personas to RDF"):
-            person_id, original_filepath = futures[future]
-            try:
-                _, result_graph_or_none, status = future.result()
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=mp_context) as executor:
+        results = executor.map(convert_and_get_result_wrapper, person_ids, filepaths, chunksize=chunksize)
+
+        # map yields results in submission order, so they line up with files_to_process_now.
+        # The wrapper never raises, so an exception here means the pool itself broke (e.g. a worker was killed);
+        # the personas handled so far are still saved below and the rest are marked as unprocessed.
+        handled_count = 0
+        try:
+            for (person_id, original_filepath), result in tqdm(zip(files_to_process_now, results), total=len(files_to_process_now), desc="Converting Personas to RDF"):
+                _, result_ntriples_or_none, status, failed_persona_data = result
+                handled_count += 1
 
                 if status == "success":
-                    newly_successful_graphs.append(result_graph_or_none)
+                    newly_successful_ntriples.append(result_ntriples_or_none)
                     if str(person_id) in unprocessed_personas_data:
                         del unprocessed_personas_data[str(person_id)]
                 else:
-                    failed_persona_data = load_json_file(original_filepath)
                     if failed_persona_data is not None:
                         if str(person_id) not in unprocessed_personas_data or unprocessed_personas_data[str(person_id)].get("processing_status") != status:
                             failed_persona_data["processing_status"] = status
                             unprocessed_personas_data[str(person_id)] = failed_persona_data
                     else:
                         if VERBOSE:
-                            print(f"WARNING: Could not reload original JSON for failed/skipped persona {person_id} at {original_filepath}. Marking with internal error in unprocessed_personas.json.")
+                            print(f"WARNING: Could not load original JSON for failed/skipped persona {person_id} at {original_filepath}. Marking with internal error in unprocessed_personas.json.")
                         unprocessed_personas_data[str(person_id)] = {"error_reloading_original_json": "File not found or corrupted during failure handling.", "original_filepath": original_filepath, "processing_status": status}
 
-            except Exception as e:
-                if VERBOSE:
-                    print(f"CRITICAL ERROR: Uncaught exception in main process during result retrieval for persona {person_id} from {original_filepath}: {e}")
-                unprocessed_personas_data[str(person_id)] = {"critical_unhandled_error": str(e), "original_filepath": original_filepath, "processing_status": "unhandled_exception_in_main_thread"}
+        except Exception as e:
+            print(f"CRITICAL ERROR: Parallel conversion aborted after {handled_count} of {len(files_to_process_now)} personas: {e}")
+            for person_id, original_filepath in files_to_process_now[handled_count:]:
+                unprocessed_personas_data[str(person_id)] = {"critical_unhandled_error": str(e), "original_filepath": original_filepath, "processing_status": "unhandled_exception"}
 
-    append_graphs_to_main_rdf(main_rdf_graph, newly_successful_graphs, MAIN_RDF_FILE)
+    append_graphs_to_main_rdf(newly_successful_ntriples, MAIN_RDF_FILE)
     save_unprocessed_personas_data(UNPROCESSED_JSON_FILE, unprocessed_personas_data)
 
     print(f"\n--- Processing Run Complete ---")
-    final_processed_count = load_processed_persona_ids_from_rdf(MAIN_RDF_FILE)
-    final_unprocessed_count_data = load_unprocessed_personas_data(UNPROCESSED_JSON_FILE)
-    print(f"Total personas now successfully in '{MAIN_RDF_FILE}': {len(final_processed_count)}")
-    print(f"Total personas now listed as unprocessed in '{UNPROCESSED_JSON_FILE}': {len(final_unprocessed_count_data)}")
+    # Both totals are known in memory; re-reading the files just written would only repeat the work.
+    final_processed_count = len(processed_ids_in_main_rdf) + len(newly_successful_ntriples)
+    print(f"Total personas now successfully in '{MAIN_RDF_FILE}': {final_processed_count}")
+    print(f"Total personas now listed as unprocessed in '{UNPROCESSED_JSON_FILE}': {len(unprocessed_personas_data)}")
 
-    if final_unprocessed_count_data:
-        print(f"\nACTION REQUIRED: There are still {len(final_unprocessed_count_data)} unprocessed personas.")
+    if unprocessed_personas_data:
+        print(f"\nACTION REQUIRED: There are still {len(unprocessed_personas_data)} unprocessed personas.")
         print(f"Please check '{UNPROCESSED_JSON_FILE}' for details on what failed.")
         if DELETE_UNPROCESSED_JSONS:
             print("The source JSON files for these unprocessed personas will be deleted automatically.")
@@ -372,6 +446,18 @@ def process_all_personas():
     else:
         print("\nAll remaining persona JSON files in the input directory have been successfully processed or were already processed!")
 
+def remove_source_json(filepath: str) -> bool:
+    try:
+        os.remove(filepath)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        print(f"ERROR: Could not delete file '{filepath}': {e}")
+    except Exception as e:
+        print(f"ERROR: An unexpected error occurred while trying to delete '{filepath}': {e}")
+    return False
+
 def delete_unprocessed_source_jsons():
     print(f"\n--- Starting Deletion of Unprocessed Source JSONs ---")
 
@@ -381,18 +467,15 @@ def delete_unprocessed_source_jsons():
         print("INFO: No unprocessed personas found in the database. Nothing to delete.")
         return
 
-    deleted_count = 0
-    for persona_id_str in tqdm(unprocessed_data.keys(), desc="Deleting Unprocessed JSONs"):
-        try:
-            filepath_to_delete = os.path.join(INPUT_DIR, f"persona_{persona_id_str}.json")
+    filepaths_to_delete = [os.path.join(INPUT_DIR, f"persona_{persona_id_str}.json") for persona_id_str in unprocessed_data.keys()]
 
-            if os.path.exists(filepath_to_delete):
-                os.remove(filepath_to_delete)
-                deleted_count += 1
-        except OSError as e:
-            print(f"ERROR: Could not delete file '{filepath_to_delete}': {e}")
-        except Exception as e:
-            print(f"ERROR: An unexpected error occurred while trying to delete persona {persona_id_str}'s file: {e}")
+    # Unlinking is pure I/O and releases the GIL, so threads overlap the syscalls.
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        deleted_count = sum(tqdm(executor.map(remove_source_json, filepaths_to_delete), total=len(filepaths_to_delete), desc="Deleting Unprocessed JSONs"))
+
+    if deleted_count:
+        # The generation step's manifest still lists the deleted results; drop it so it is rebuilt from the directory.
+        invalidate_processed_manifest(INPUT_DIR)
 
     print(f"INFO: Deleted {deleted_count} source JSON files corresponding to unprocessed personas from '{INPUT_DIR}'.")
     print(f"--- Deletion Complete ---")
@@ -402,4 +485,7 @@ if __name__ == "__main__":
         process_all_personas()
         
     if DELETE_UNPROCESSED_JSONS:
-        delete_unprocessed_source_jsons()
\ No newline at end of file
+        delete_unprocessed_source_jsons()
+
+    if EXPORT_TURTLE:
+        export_main_rdf_as_turtle(MAIN_RDF_FILE, TURTLE_RDF_FILE)
\ No newline at end of file
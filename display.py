@@ -1,6 +1,5 @@
 import os
 import random
-import re
 from config import RESULTS_DIR
 from rdflib import Graph, URIRef
 
@@ -58,18 +57,19 @@ def extract_numeric_suffix(uri: URIRef) -> int | float:
     Returns:
         int | float: The extracted integer suffix, or float('inf') if not found.
     """
-    match = re.search(r'/(\d+)$', str(uri))
-    return int(match.group(1)) if match else float('inf')
+    tail = str(uri).rsplit('/', 1)[-1]
+    return int(tail) if tail.isdecimal() else float('inf')
     
 if __name__ == "__main__":
-    rdf_file = f"{RESULTS_DIR}/rdf_processed/personas-db.ttl"
+    rdf_file = f"{RESULTS_DIR}/rdf_processed/personas-db.nt"
     assert_file_exists(rdf_file)
     
-    graph = load_graph(rdf_file)
+    graph = load_graph(rdf_file, format="nt")
 
     if graph:
         # subjects = sorted({s for s in graph.subjects() if isinstance(s, URIRef)})
-        subjects = sorted({s for s in graph.subjects() if isinstance(s, URIRef)}, key=extract_numeric_suffix)
+        subject_suffixes = {s: extract_numeric_suffix(s) for s in set(graph.subjects()) if isinstance(s, URIRef)}
+        subjects = sorted(subject_suffixes, key=subject_suffixes.__getitem__)
         total_subjects = len(subjects)
 
         if total_subjects == 0:
@@ -82,7 +82,7 @@ if __name__ == "__main__":
                 valid_indices = [i for i in indices_of_interest if 0 <= i < total_subjects]
 
             if valid_indices:
-                selected_subjects = [s for s in subjects if extract_numeric_suffix(s) in valid_indices]
+                selected_subjects = [s for s in subjects if subject_suffixes[s] in valid_indices]
             else:
                 print("No valid indices provided. Using random subjects instead.")
                 selected_subjects = random.sample(subjects, min(3, total_subjects))
@@ -1,33 +1,105 @@
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from typing import List, Union
+from contextlib import nullcontext
+from functools import partial
+from torch.nn.attention import SDPBackend, sdpa_kernel
+from transformers import AutoConfig, AutoTokenizer, AutoModelForCausalLM
+from typing import List, Optional, Union
+from config import MODEL_NAME, MAX_NEW_TOKENS
 
 
 class LlamaModel:
-    def __init__(self, model_name: str) -> None:
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        compile_model: bool = False,
+        batch_size: int = 8,
+        max_prompt_length: int = 2048,
+        max_new_tokens: int = MAX_NEW_TOKENS,
+    ) -> None:
         """
         Initialize the LlamaModel with a specified model name.
 
         Args:
-            model_name (str): The name or path of the pretrained model to load.
+            model_name (str, optional): The name or path of the pretrained model to load. Defaults to
+                MODEL_NAME from config, the AWQ W4A16 checkpoint produced by quantifier.py.
+            compile_model (bool, optional): Decode with a static KV cache and a torch.compile'd forward pass
+                captured as a CUDA graph. Not supported for quantized checkpoints such as the default AWQ one.
+                Defaults to False.
+            batch_size (int, optional): Batch size the compiled model always runs at; smaller batches are
+                padded up to it. Only used with compile_model. Defaults to 8.
+            max_prompt_length (int, optional): Prompt length in tokens the static cache is sized for; longer
+                prompts are truncated. Should be a multiple of 64. Only used with compile_model. Defaults to 2048.
+            max_new_tokens (int, optional): Generation length the static cache is sized for; generate_response
+                caps max_new_tokens at this value. Only used with compile_model. Defaults to MAX_NEW_TOKENS from config.
+
+        Raises:
+            ValueError: If compile_model is set for a quantized checkpoint.
         """
+        # AWQ's GEMM layers call a custom CUDA kernel that Dynamo cannot trace, so fullgraph compilation would fail.
+        if compile_model and getattr(AutoConfig.from_pretrained(model_name), "quantization_config", None) is not None:
+            raise ValueError(
+                f"compile_model is not supported for the quantized checkpoint '{model_name}'; load an unquantized model or set compile_model=False."
+            )
+
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.tokenizer.padding_side = "left"
 
         if self.tokenizer.pad_token is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
 
-        self.model = AutoModelForCausalLM.from_pretrained(
-            model_name, torch_dtype=torch.float16, device_map="auto"
-        )
+        self.model = None
+        # FlashAttention-2 needs Ampere or newer on every GPU; on older ones loading succeeds and generate() fails.
+        if torch.cuda.is_available() and all(
+            torch.cuda.get_device_capability(i)[0] >= 8 for i in range(torch.cuda.device_count())
+        ):
+            try:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    model_name,
+                    torch_dtype=torch.float16,
+                    device_map="auto",
+                    attn_implementation="flash_attention_2",
+                )
+                self.attention_context = nullcontext
+            except (ImportError, ValueError):
+                # flash-attn is not installed.
+                pass
+
+        if self.model is None:
+            self.model = AutoModelForCausalLM.from_pretrained(
+                model_name,
+                torch_dtype=torch.float16,
+                device_map="auto",
+                attn_implementation="sdpa",
+            )
+            # Keep SDPA on its tiled kernels instead of letting it fall back to the math path.
+            self.attention_context = partial(
+                sdpa_kernel, [SDPBackend.FLASH_ATTENTION, SDPBackend.EFFICIENT_ATTENTION]
+            )
 
         self.model.eval()
 
+        self.compile_model = compile_model
+        if compile_model:
+            self.model.generation_config.cache_implementation = "static"
+            self.model.forward = torch.compile(
+                self.model.forward, mode="reduce-overhead", fullgraph=True
+            )
+            self.batch_size = batch_size
+            self.max_prompt_length = max_prompt_length
+            self.max_new_tokens = max_new_tokens
+            # generate() keeps its static cache while the batch size matches and the cache is long enough, so
+            # warming up at the full batch size, prompt length and generation length builds the one cache (and
+            # decode graph) every later call reuses, and pays the compilation cost here.
+            self.generate_response(
+                ["Hello " * max_prompt_length] * batch_size, max_new_tokens=max_new_tokens
+            )
+
     def generate_response(
         self,
         prompts: Union[str, List[str]],
         max_new_tokens: int = 1024,
         temperature: float = 0.2,
+        batch_size: Optional[int] = None,
     ) -> Union[str, List[str]]:
         """
         Generate text responses for one or more prompts.
@@ -36,6 +108,9 @@ class LlamaModel:
             prompts (Union[str, List[str]]): A single prompt string or a list of prompt strings.
             max_new_tokens (int, optional): Maximum number of new tokens to generate. Defaults to 1024.
             temperature (float, optional): Sampling temperature. Higher values increase randomness. Defaults to 0.2.
+            batch_size (Optional[int], optional): If set, generate in batches of at most this many prompts,
+                grouping prompts of similar length to reduce padding. Defaults to None (one batch). A compiled
+                model always uses the batch size it was built with.
 
         Returns:
             Union[str, List[str]]: Generated response(s) as a string or list of strings.
@@ -47,27 +122,54 @@ class LlamaModel:
             prompts_list = prompts
             return_single = False
 
+        if self.compile_model:
+            batch_size = self.batch_size
+            max_new_tokens = min(max_new_tokens, self.max_new_tokens)
+
+        if batch_size is not None and len(prompts_list) > batch_size:
+            # Batch by prompt length (a proxy for token count) so each batch carries little left-padding.
+            order = sorted(range(len(prompts_list)), key=lambda i: len(prompts_list[i]))
+            decoded_outputs = [""] * len(prompts_list)
+            for start in range(0, len(order), batch_size):
+                batch_indices = order[start : start + batch_size]
+                batch_outputs = self.generate_response(
+                    [prompts_list[i] for i in batch_indices], max_new_tokens, temperature
+                )
+                for i, decoded_text in zip(batch_indices, batch_outputs):
+                    decoded_outputs[i] = decoded_text
+            return decoded_outputs
+
+        num_prompts = len(prompts_list)
+        if self.compile_model and num_prompts < self.batch_size:
+            # Filler prompts keep the batch dimension equal to the static cache's; their outputs are dropped.
+            prompts_list = prompts_list + [""] * (self.batch_size - num_prompts)
+
+        # Bucketing padded lengths keeps the compiled graph's input shapes stable.
         inputs = self.tokenizer(
-            prompts_list, padding=True, truncation=True, return_tensors="pt"
+            prompts_list,
+            padding=True,
+            truncation=True,
+            max_length=self.max_prompt_length if self.compile_model else None,
+            pad_to_multiple_of=64 if self.compile_model else None,
+            return_tensors="pt",
+        ).to(self.model.device)
+
+        gen_kwargs = dict(
+            max_new_tokens=max_new_tokens, pad_token_id=self.tokenizer.pad_token_id
         )
-        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
-
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_new_tokens=max_new_tokens,
-                temperature=temperature,
-                do_sample=True if temperature > 0.0 else False,
-                pad_token_id=self.tokenizer.pad_token_id,
-            )
+        if temperature > 0.0:
+            gen_kwargs.update(do_sample=True, temperature=temperature)
+        else:
+            # Plain greedy decoding: no temperature warper and no sampling step.
+            gen_kwargs["do_sample"] = False
 
-        decoded_outputs = []
-        for i in range(len(prompts_list)):
-            output_sequence = outputs[i][inputs["input_ids"].shape[1] :]
-            decoded_text = self.tokenizer.decode(
-                output_sequence, skip_special_tokens=True
-            )
-            decoded_outputs.append(decoded_text)
+        with torch.inference_mode(), self.attention_context():
+            outputs = self.model.generate(**inputs, **gen_kwargs)
+
+        new_tokens = outputs[:, inputs["input_ids"].shape[1] :]
+        decoded_outputs = self.tokenizer.batch_decode(
+            new_tokens[:num_prompts], skip_special_tokens=True
+        )
 
         if return_single:
             return decoded_outputs[0]
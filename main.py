@@ -1,9 +1,11 @@
 import os
 import json
+import orjson
 import re
 import time
 import torch
 from datasets import load_dataset
+from transformers import AutoConfig
 from config import (
     MODEL_NAME,
     DATASET_NAME,
@@ -12,20 +14,33 @@ from config import (
     TEMPLATE_PATH,
     RESULTS_DIR,
     MAX_NEW_TOKENS,
+    STOP_SEQUENCES,
     TEMPERATURE,
     MAX_NUM_SEQS,
+    TENSOR_PARALLEL_SIZE,
+    SPECULATIVE_CONFIG,
 )
 from utils import (
     load_json_template,
     ensure_directory_exists,
     extract_json_from_output,
     get_processed_persona_ids,
+    record_processed_persona_id,
 )
-from prompt_builder import build_extraction_prompt
+from prompt_builder import build_extraction_prompt_factory
 from vllm import LLM, SamplingParams
 from tqdm import tqdm
 
 
+def _tensor_parallel_size() -> int:
+    if TENSOR_PARALLEL_SIZE is not None:
+        return TENSOR_PARALLEL_SIZE
+    # vLLM splits the attention heads evenly across GPUs, so take the largest visible GPU count that divides them.
+    num_attention_heads = AutoConfig.from_pretrained(MODEL_NAME, trust_remote_code=True).num_attention_heads
+    max_gpus = max(1, torch.cuda.device_count())
+    return max(size for size in range(1, max_gpus + 1) if num_attention_heads % size == 0)
+
+
 def main():
     print(f"Initializing vLLM with model: {MODEL_NAME}...")
     llm = LLM(
@@ -34,12 +49,20 @@ def main():
         max_num_seqs=MAX_NUM_SEQS,
         max_model_len=131072,
         trust_remote_code=True,
-        tensor_parallel_size=4,
+        tensor_parallel_size=_tensor_parallel_size(),
         gpu_memory_utilization=0.9,
+        enable_prefix_caching=True,
+        speculative_config=SPECULATIVE_CONFIG,
     )
     print("vLLM model initialized.")
 
-    sampling_params = SamplingParams(temperature=TEMPERATURE, max_tokens=MAX_NEW_TOKENS)
+    # The stop string contains the JSON's closing brace, so keep it in the output for extraction.
+    sampling_params = SamplingParams(
+        temperature=TEMPERATURE,
+        max_tokens=MAX_NEW_TOKENS,
+        stop=STOP_SEQUENCES,
+        include_stop_str_in_output=True,
+    )
     print(f"Sampling parameters: Temperature={TEMPERATURE}, Max New Tokens={MAX_NEW_TOKENS}")
 
     print(f"Loading dataset: {DATASET_NAME}/{DATASET_SUBSET} split {DATASET_SPLIT}...")
@@ -63,21 +86,25 @@ def main():
             offset_from_original_dataset_start = int(start_str)
 
 
-    personas_to_process_tuples_all_in_slice = []
-    all_global_ids_in_current_slice = set()
-    for relative_idx_in_slice, data_entry in enumerate(full_datasets):
-        true_global_idx = offset_from_original_dataset_start + relative_idx_in_slice
-
-        personas_to_process_tuples_all_in_slice.append((true_global_idx, data_entry["persona"]))
-        all_global_ids_in_current_slice.add(true_global_idx)
+    all_global_ids_in_current_slice = set(
+        range(offset_from_original_dataset_start, offset_from_original_dataset_start + total_personas_in_dataset_slice)
+    )
 
     processed_ids_at_start = get_processed_persona_ids(RESULTS_DIR, all_global_ids_in_current_slice)
     initial_completed_count_in_slice = len(processed_ids_at_start)
 
-    personas_to_process_this_run = []
-    for global_idx, persona_text in personas_to_process_tuples_all_in_slice:
-        if global_idx not in processed_ids_at_start:
-            personas_to_process_this_run.append((global_idx, persona_text))
+    # Select the unprocessed rows by index and read only their "persona" column from Arrow,
+    # instead of decoding every row of the slice into a Python dict.
+    remaining_relative_indices = [
+        relative_idx_in_slice
+        for relative_idx_in_slice in range(total_personas_in_dataset_slice)
+        if offset_from_original_dataset_start + relative_idx_in_slice not in processed_ids_at_start
+    ]
+    remaining_persona_texts = full_datasets.select(remaining_relative_indices)["persona"]
+    personas_to_process_this_run = [
+        (offset_from_original_dataset_start + relative_idx_in_slice, persona_text)
+        for relative_idx_in_slice, persona_text in zip(remaining_relative_indices, remaining_persona_texts)
+    ]
 
     remaining_at_start_of_run = len(personas_to_process_this_run)
 
@@ -91,8 +118,9 @@ def main():
     vllm_output_idx_to_global_idx = {}
     vllm_output_idx_to_persona_text = {}
 
+    prompt_prefix, prompt_suffix = build_extraction_prompt_factory(template_json)
     for i, (global_idx, persona_text) in enumerate(personas_to_process_this_run):
-        prompt = build_extraction_prompt(persona_text, template_json)
+        prompt = prompt_prefix + persona_text + prompt_suffix
         list_of_prompts_for_vllm.append(prompt)
         vllm_output_idx_to_global_idx[i] = global_idx
         vllm_output_idx_to_persona_text[i] = persona_text
@@ -138,25 +166,29 @@ def main():
                 continue
 
             generated_text = output.outputs[0].text
-            extracted_json_str = extract_json_from_output(generated_text)
 
             try:
-                if extracted_json_str is None:
-                    raise json.JSONDecodeError("extract_json_from_output returned None", "", 0)
-
-                parsed_json = json.loads(extracted_json_str)
+                parsed_json = extract_json_from_output(generated_text)
                 parsed_json['description'] = current_persona_text
 
                 filename = os.path.join(RESULTS_DIR, f"persona_{global_idx}.json")
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(parsed_json, f, indent=2, ensure_ascii=False)
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(parsed_json, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+                # Only recorded once the file is fully written, so the manifest never lists a missing result.
+                # The JSON is already saved, so a failed manifest append is only a warning; the next run's
+                # manifest simply lacks this persona and it is generated again.
+                try:
+                    record_processed_persona_id(RESULTS_DIR, global_idx)
+                except OSError as e:
+                    print(f"\n!!! WARNING: Could not record persona {global_idx} in the processed manifest: {e}")
 
                 completed_in_this_run_counter += 1
                 pbar.update(1)
 
             except json.JSONDecodeError as e:
                 print(f"\n!!! ERROR: Could not extract valid JSON for persona {global_idx}. JSONDecodeError: {e}")
-                problematic_snippet = extracted_json_str[:500] if extracted_json_str else "(empty or None)"
+                problematic_snippet = generated_text[:500] if generated_text else "(empty or None)"
                 print(f"!!! Problematic string (first 500 chars): \n{problematic_snippet}...")
                 print("!!! Saving full raw output to a .txt file for debugging.")
                 filename = os.path.join(RESULTS_DIR, f"persona_{global_idx}_error.txt")
@@ -1,20 +1,9 @@
-import json
+from functools import lru_cache
+from typing import Tuple
 
+from utils import format_template_for_prompt
 
-def build_extraction_prompt(persona: str, template_json: dict) -> str:
-    """
-    Build a prompt for extracting structured information from a persona using a JSON template.
-
-    Args:
-        persona (str): The text content of the persona.
-        template_json (dict): The JSON template as a dictionary.
-
-    Returns:
-        str: The formatted prompt string for the language model.
-    """
-    template_str = json.dumps({key: "" for key in template_json.keys()}, indent=2)
-
-    field_rules = """
+FIELD_RULES = """
     Field Value Options:
     - ability to speak english: "Fluent", "Moderate", "Beginner", "Novice", "Not Applicable"
     - household language: "English", "Spanish", "Arabic", etc. (can be multiple)
@@ -23,22 +12,26 @@ def build_extraction_prompt(persona: str, template_json: dict) -> str:
     - class of worker: "Private Organization", "Government", "Self-employed", "Unpaid", "Not applicable", "Public Sector" etc..
     """.strip()
 
-    dependencies = """
+DEPENDENCIES = """
     Field Dependencies:
     - 'ability to speak english' should consider 'citizenship', 'household language', 'education'.
     - 'household language' may reflect multilingualism.
     - 'health insurance' may depend on employment and region.
     """
 
-    prompt = f"""
-    You are a helpful assistant that extracts structured information from personas.
 
-    Given the following persona:
-    \"\"\"{persona}\"\"\"
+@lru_cache(maxsize=1)
+def _build_prompt_parts(template_keys: Tuple[str, ...]) -> Tuple[str, str]:
+    """Render the persona-independent parts of the prompt once per template."""
+    template_str = format_template_for_prompt(dict.fromkeys(template_keys))
+
+    # The persona comes last so every prompt shares the same instruction prefix for KV prefix caching.
+    prefix = f"""
+    You are a helpful assistant that extracts structured information from personas.
 
     Instructions:
-    - Fill in the following JSON fields based only on the persona information.
-    - If something is not specified or uncertain, creatively fill in with what is appropriate and realistic to the persona's description in "{persona}".
+    - Fill in the following JSON fields based only on the persona information given at the end.
+    - If something is not specified or uncertain, creatively fill in with what is appropriate and realistic to the persona's description.
     - Avoid generic or implausible values (such as filling the majority of the keys with "None" or "Not Applicable"); instead, be creative and realistic across different personas.
     - Not all Europeans or non-Europeans who are residents (citizens) of the United States (United Kingdom) are fluent in English, though the majority are. So, consider other plausible citizenship also.
     - For inclusion and diversity of personas, seldom fill 'disability', 'vision difficulty', and 'veteran status' with plausible values (instead of 'None') correlating to other keys in the JSON template
@@ -50,13 +43,43 @@ def build_extraction_prompt(persona: str, template_json: dict) -> str:
     - Match data types (e.g., age: int, income: float).
     - Keep outputs concise and JSON-valid with proper structure where applicable and keep its keys unchanged.
 
-    {field_rules}
+    {FIELD_RULES}
 
-    {dependencies}
+    {DEPENDENCIES}
 
     - Here's the JSON template to be considered, but DO NOT output it in the generated output.
     {template_str}
 
     - Once the JSON template has been filled, you MUST start its output with "```json" and MUST end it with "```", then "\n" DO NOT generate any further text or tokens in any format again. 
-    """.strip()
-    return prompt
+
+    Given the following persona:
+    \"\"\"""".lstrip()
+    return prefix, '"""'
+
+
+def build_extraction_prompt_factory(template_json: dict) -> Tuple[str, str]:
+    """
+    Precompute the parts of the extraction prompt that do not depend on the persona.
+
+    Args:
+        template_json (dict): The JSON template as a dictionary.
+
+    Returns:
+        Tuple[str, str]: The prompt prefix and suffix; a full prompt is prefix + persona + suffix.
+    """
+    return _build_prompt_parts(tuple(template_json.keys()))
+
+
+def build_extraction_prompt(persona: str, template_json: dict) -> str:
+    """
+    Build a prompt for extracting structured information from a persona using a JSON template.
+
+    Args:
+        persona (str): The text content of the persona.
+        template_json (dict): The JSON template as a dictionary.
+
+    Returns:
+        str: The formatted prompt string for the language model.
+    """
+    prefix, suffix = build_extraction_prompt_factory(template_json)
+    return prefix + persona + suffix
@@ -1,7 +1,11 @@
 import json
 import os
-import re
-from typing import Set, Dict
+import orjson
+from typing import Any, Set, Dict
+
+_JSON_DECODER = json.JSONDecoder()
+
+PROCESSED_MANIFEST_FILENAME = "processed_manifest.jsonl"
 
 
 def load_json_template(path: str) -> dict:
@@ -14,8 +18,8 @@ def load_json_template(path: str) -> dict:
     Returns:
         dict: Loaded JSON as a dictionary.
     """
-    with open(path, "r") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def format_template_for_prompt(template: dict) -> str:
@@ -28,7 +32,7 @@ def format_template_for_prompt(template: dict) -> str:
     Returns:
         str: JSON string with all values set to empty strings.
     """
-    return json.dumps({key: "" for key in template.keys()}, indent=2)
+    return orjson.dumps({key: "" for key in template.keys()}, option=orjson.OPT_INDENT_2).decode("utf-8")
 
 def assert_file_exists(file_path: str):
     """Raises AssertionError if the file does not exist."""
@@ -44,11 +48,67 @@ def ensure_directory_exists(directory_path: str) -> None:
     os.makedirs(directory_path, exist_ok=True)
 
 
+def _scan_processed_persona_ids(results_dir: str) -> Set[int]:
+    """Collect the IDs of all persona_<id>.json result files in the results directory."""
+    processed_ids = set()
+    with os.scandir(results_dir) as entries:
+        for entry in entries:
+            filename = entry.name
+            if filename.startswith("persona_") and filename.endswith(".json"):
+                persona_id_str = filename[len("persona_"):-len(".json")]
+                if persona_id_str.isdecimal():
+                    processed_ids.add(int(persona_id_str))
+    return processed_ids
+
+
+def _load_processed_manifest(manifest_path: str) -> Set[int]:
+    """Read the IDs recorded as successful in the processed manifest, skipping unreadable lines."""
+    processed_ids = set()
+    with open(manifest_path, "rb") as f:
+        for line in f:
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("status") == "success":
+                processed_ids.add(record["id"])
+    return processed_ids
+
+
+def record_processed_persona_id(results_dir: str, persona_id: int) -> None:
+    """
+    Append a successfully saved persona ID to the processed manifest in the results directory.
+
+    Args:
+        results_dir (str): Directory containing result files.
+        persona_id (int): Global ID of the persona whose result JSON was written.
+    """
+    line = orjson.dumps({"id": persona_id, "status": "success"}) + b"\n"
+    with open(os.path.join(results_dir, PROCESSED_MANIFEST_FILENAME), "ab") as f:
+        f.write(line)
+
+
+def invalidate_processed_manifest(results_dir: str) -> None:
+    """
+    Remove the processed manifest so the next run rebuilds it from the result files.
+
+    Args:
+        results_dir (str): Directory containing result files.
+    """
+    try:
+        os.remove(os.path.join(results_dir, PROCESSED_MANIFEST_FILENAME))
+    except FileNotFoundError:
+        pass
+
+
 def get_processed_persona_ids(
     results_dir: str, expected_global_ids_in_split: Set[int]
 ) -> Set[int]:
     """
-    Get the set of processed persona IDs by scanning the results directory for JSON files.
+    Get the set of processed persona IDs from the results directory's processed manifest.
+
+    If the manifest does not exist yet, the directory is scanned for JSON files once and the manifest is rebuilt
+    from the result, so later runs start without a full directory scan.
 
     Args:
         results_dir (str): Directory containing result files.
@@ -57,62 +117,50 @@ def get_processed_persona_ids(
     Returns:
         Set[int]: Set of processed persona IDs found in the directory and present in the expected IDs.
     """
-    processed_ids = set()
     if not os.path.exists(results_dir):
-        return processed_ids
+        return set()
 
-    for filename in os.listdir(results_dir):
-        if filename.startswith("persona_") and filename.endswith(".json"):
-            try:
-                match = re.match(r"persona_(\d+)\.json$", filename)
-                if match:
-                    persona_id = int(match.group(1))
-                    if persona_id in expected_global_ids_in_split:
-                        processed_ids.add(persona_id)
-            except ValueError:
-                continue
-    return processed_ids
+    manifest_path = os.path.join(results_dir, PROCESSED_MANIFEST_FILENAME)
+    if os.path.exists(manifest_path):
+        processed_ids = _load_processed_manifest(manifest_path)
+    else:
+        processed_ids = _scan_processed_persona_ids(results_dir)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.writelines(orjson.dumps({"id": persona_id, "status": "success"}) + b"\n" for persona_id in sorted(processed_ids))
+        os.replace(temp_path, manifest_path)
+
+    return processed_ids & expected_global_ids_in_split
 
 
-def extract_json_from_output(text: str) -> str:
+def extract_json_from_output(text: str) -> Any:
     """
-    Extract a JSON string from model output text.
+    Extract and parse the JSON object from model output text.
 
     Args:
         text (str): The output text from the model.
 
     Returns:
-        str: Extracted JSON string if found, otherwise returns the original text.
-    """
-    extracted_json_str = ""
-    # json_match = re.search(r"```json\s*(\{.*?\})\s*```", text, re.DOTALL)
-    json_match = re.search(r"```json\s*(.*?)(?:```|(?=\s*[}\]]?\s*$))", text, re.DOTALL)
+        Any: The parsed 33-key JSON object if found, otherwise the whole text parsed as JSON.
 
-    if json_match:
-        extracted_json_str = json_match.group(1)
+    Raises:
+        json.JSONDecodeError: If no 33-key object is found and the text itself is not valid JSON.
+    """
+    # Try the first object after the ```json fence, then the first object anywhere in the text.
+    # raw_decode scans in C and stops at the end of the object, so trailing text is ignored.
+    fence_idx = text.find("```json")
+    fenced_brace_idx = text.find("{", fence_idx + len("```json")) if fence_idx != -1 else -1
+    first_brace_idx = text.find("{")
 
+    for start_idx in (fenced_brace_idx, first_brace_idx):
+        if start_idx == -1:
+            continue
         try:
-            parsed_json = json.loads(extracted_json_str)
-
-            if isinstance(parsed_json, dict) and len(parsed_json) == 33:
-                return extracted_json_str
-            else:
-                pass
+            parsed_json, _ = _JSON_DECODER.raw_decode(text, start_idx)
         except json.JSONDecodeError:
-            pass
+            continue
 
-    first_brace_idx = text.find("{")
-    if first_brace_idx != -1:
-        decoder = json.JSONDecoder()
-        try:
-            parsed_json, end_idx = decoder.raw_decode(text[first_brace_idx:])
-            fallback_json_str = text[first_brace_idx : first_brace_idx + end_idx]
-
-            if isinstance(parsed_json, dict) and len(parsed_json) == 33:
-                return fallback_json_str
-            else:
-                pass
-        except json.JSONDecodeError:
-            pass
+        if isinstance(parsed_json, dict) and len(parsed_json) == 33:
+            return parsed_json
 
-    return text
+    return json.loads(text)